@@ -6,6 +6,10 @@ This catches 2-node laundering cycles that the main cycle detector skips
 (minimum cycle length = 3).
 
 A tolerance parameter controls how similar the amounts must be (default 20%).
+
+With Numba installed the tolerance scan runs as a parallel compiled kernel
+over integer-coded endpoints; otherwise the NumPy array path is used. Both
+paths produce the identical pair set.
 """
 from __future__ import annotations
 
@@ -13,47 +17,113 @@ import logging
 from typing import List, Dict
 
 import networkx as nx
+import numpy as np
+import pandas as pd
 
 from .config import ROUND_TRIP_AMOUNT_TOLERANCE
 
+try:
+    import numba
+except ImportError:  # pragma: no cover - numba is an optional accelerator
+    numba = None
+
 log = logging.getLogger(__name__)
 
 
+if numba is not None:
+
+    @numba.njit(cache=True, parallel=True)
+    def _round_trip_scan(u_codes, v_codes, amt, rev, tol, keep, ratio):  # pragma: no cover - compiled
+        """
+        Parallel tolerance scan: keep[i] marks the lexically-forward edge of
+        each reciprocal pair with positive flow both ways whose amounts agree
+        within `tol`; ratio[i] holds the relative difference.
+        """
+        for i in numba.prange(u_codes.shape[0]):
+            j = rev[i]
+            if j < 0 or u_codes[i] >= v_codes[i]:
+                continue
+            a = amt[i]
+            b = amt[j]
+            if a <= 0.0 or b <= 0.0:
+                continue
+            hi = a if a > b else b
+            lo = b if a > b else a
+            r = (hi - lo) / hi
+            if r <= tol:
+                keep[i] = True
+                ratio[i] = r
+
+
 def detect_round_trips(G: nx.DiGraph) -> List[Dict]:
     """
     Detect bi-directional edges where flow in both directions is similar.
 
+    The tolerance comparison runs over NumPy edge arrays instead of a
+    per-edge Python loop with `has_edge` hash lookups; each pair is kept
+    once via the lexical `u < v` direction (replacing the `seen` set).
+
     Returns ring dicts with pattern = "round_trip".
     """
     rings: List[Dict] = []
-    seen: set = set()
 
-    for u, v, attrs in G.edges(data=True):
-        if G.has_edge(v, u):
-            key = tuple(sorted([u, v]))
-            if key in seen:
-                continue
-            seen.add(key)
+    if G.number_of_edges() == 0:
+        log.info("Round-trip detection: 0 pairs found")
+        return rings
 
-            fwd_amount = attrs.get("total_amount", 0.0)
-            rev_amount = G[v][u].get("total_amount", 0.0)
+    edges = list(G.edges)
+    u = np.fromiter((e[0] for e in edges), dtype=object, count=len(edges))
+    v = np.fromiter((e[1] for e in edges), dtype=object, count=len(edges))
+    amt = np.fromiter(
+        (G[a][b].get("total_amount", 0.0) for a, b in edges),
+        dtype=np.float64,
+        count=len(edges),
+    )
 
-            if fwd_amount <= 0 or rev_amount <= 0:
-                continue
+    # Index edges once, then resolve each edge's reverse in O(1) per edge.
+    idx = {(a, b): i for i, (a, b) in enumerate(edges)}
+    rev = np.fromiter(
+        (idx.get((b, a), -1) for a, b in edges),
+        dtype=np.int64,
+        count=len(edges),
+    )
+
+    bwd = amt[rev]
 
-            # Check if amounts are within tolerance of each other
-            larger = max(fwd_amount, rev_amount)
-            smaller = min(fwd_amount, rev_amount)
+    if numba is not None:
+        # sort=True makes code order match lexical order, so the kernel's
+        # integer comparison is equivalent to the u < v string comparison.
+        codes_all, _ = pd.factorize(np.concatenate([u, v]), sort=True)
+        keep = np.zeros(len(edges), dtype=np.bool_)
+        diff_ratio = np.zeros(len(edges), dtype=np.float64)
+        _round_trip_scan(
+            codes_all[: len(edges)].astype(np.int64),
+            codes_all[len(edges):].astype(np.int64),
+            amt,
+            rev,
+            ROUND_TRIP_AMOUNT_TOLERANCE,
+            keep,
+            diff_ratio,
+        )
+    else:
+        # Keep only the lexically-forward direction of each reciprocal pair
+        # with positive flow both ways, then apply the tolerance vectorised.
+        keep = (rev >= 0) & (u < v) & (amt > 0) & (bwd > 0)
+        larger = np.maximum(amt, bwd)
+        smaller = np.minimum(amt, bwd)
+        with np.errstate(divide="ignore", invalid="ignore"):
             diff_ratio = (larger - smaller) / larger
+        keep &= diff_ratio <= ROUND_TRIP_AMOUNT_TOLERANCE
 
-            if diff_ratio <= ROUND_TRIP_AMOUNT_TOLERANCE:
-                rings.append({
-                    "members": sorted([u, v]),
-                    "pattern": "round_trip",
-                    "forward_amount": fwd_amount,
-                    "reverse_amount": rev_amount,
-                    "similarity": round(1.0 - diff_ratio, 3),
-                })
+    for i in np.flatnonzero(keep):
+        # keep already enforces u < v, so the pair is in lexical order.
+        rings.append({
+            "members": [u[i], v[i]],
+            "pattern": "round_trip",
+            "forward_amount": float(amt[i]),
+            "reverse_amount": float(bwd[i]),
+            "similarity": round(1.0 - float(diff_ratio[i]), 3),
+        })
 
     log.info("Round-trip detection: %d pairs found", len(rings))
     return rings
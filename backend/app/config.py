@@ -77,6 +77,11 @@ STRUCTURING_THRESHOLD: float = float(os.getenv("STRUCTURING_THRESHOLD", "10000.0
 STRUCTURING_MARGIN: float = float(os.getenv("STRUCTURING_MARGIN", "0.15"))
 STRUCTURING_MIN_TX: int = int(os.getenv("STRUCTURING_MIN_TX", "3"))
 
+# ── Graph payload ──────────────────────────────────────────────────────────────
+# Visualisation cap: above this many nodes the response omits per-edge
+# transaction lists (and build_graph skips constructing them entirely).
+GRAPH_PAYLOAD_NODE_CAP: int = int(os.getenv("GRAPH_PAYLOAD_NODE_CAP", "2000"))
+
 # ── Risk weights for fraud_rings ───────────────────────────────────────────────
 RING_RISK: dict = {
     "cycle_length_3": 95.0,
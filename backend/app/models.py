@@ -69,7 +69,7 @@ class AnalysisResult(BaseModel):
     suspicious_accounts: List[SuspiciousAccount]
     fraud_rings: List[FraudRing]
     summary: AnalysisSummary
-    graph: GraphData
+    graph: Optional[GraphData] = None  # present only for detail=true responses
 
 
 class ParseStats(BaseModel):
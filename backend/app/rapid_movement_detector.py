@@ -10,8 +10,7 @@ RAPID_MOVEMENT_MINUTES.
 from __future__ import annotations
 
 import logging
-from datetime import timedelta
-from typing import Dict, Set
+from typing import Dict
 
 import pandas as pd
 
@@ -24,72 +23,63 @@ def detect_rapid_movements(df: pd.DataFrame) -> Dict[str, Dict]:
     """
     Detect accounts with short dwell times (receive → send within minutes).
 
+    Each incoming transaction is paired with the account's NEXT outgoing
+    transaction via one pd.merge_asof call (C-level, int64-timestamp sweep)
+    with the window as its tolerance — no Python per-account loops.
+
     Returns
     -------
     dict mapping account_id to:
         min_dwell_minutes : float  – shortest observed dwell time
-        rapid_count       : int    – number of rapid pass-through pairs
+        rapid_count       : int    – number of rapidly-forwarded incoming txs
     """
     flagged: Dict[str, Dict] = {}
 
     if df.empty:
         return flagged
 
-    window_td = timedelta(minutes=RAPID_MOVEMENT_MINUTES)
-    df_sorted = df.sort_values("timestamp")
-
-    # Build per-account sorted timestamp lists using vectorised groupby —
-    # avoids iterrows() which is O(N) in slow Python and takes ~15s on 10k rows.
-    recv_times: Dict[str, list] = (
-        df_sorted[["receiver_id", "timestamp"]]
-        .groupby("receiver_id")["timestamp"]
-        .apply(list)
-        .to_dict()
+    tolerance = pd.Timedelta(minutes=RAPID_MOVEMENT_MINUTES)
+
+    # merge_asof needs a global sort on the key column — free when the parser
+    # already delivered time order. "acc" is cast to object because
+    # sender/receiver carry distinct categorical vocabularies.
+    if not df["timestamp"].is_monotonic_increasing:
+        df = df.sort_values("timestamp")
+    in_df = (
+        df[["receiver_id", "timestamp"]]
+        .rename(columns={"receiver_id": "acc"})
+        .assign(acc=lambda d: d["acc"].astype(object))
     )
-    send_times: Dict[str, list] = (
-        df_sorted[["sender_id", "timestamp"]]
-        .groupby("sender_id")["timestamp"]
-        .apply(list)
-        .to_dict()
+    out_df = (
+        df[["sender_id", "timestamp"]]
+        .rename(columns={"sender_id": "acc"})
+        .assign(acc=lambda d: d["acc"].astype(object), out_ts=lambda d: d["timestamp"])
+    )
+
+    paired = pd.merge_asof(
+        in_df, out_df,
+        on="timestamp", by="acc",
+        direction="forward", tolerance=tolerance,
+    ).dropna(subset=["out_ts"])
+
+    if paired.empty:
+        log.info("Rapid movement detection: 0 accounts flagged")
+        return flagged
+
+    dwell = (paired["out_ts"] - paired["timestamp"]).dt.total_seconds() / 60.0
+    agg = (
+        paired.assign(dwell=dwell)
+        .groupby("acc", sort=False, observed=True)
+        .agg(min_dwell=("dwell", "min"), rapid_count=("dwell", "size"))
     )
 
-    # Rename for the loop below (mirrors old variable names)
-    incoming = recv_times
-    outgoing = send_times
-
-    all_accounts = set(incoming.keys()) & set(outgoing.keys())
-
-    for acc in all_accounts:
-        in_times = incoming[acc]
-        out_times = outgoing[acc]
-
-        min_dwell = None
-        rapid_count = 0
-
-        # Both lists are already sorted since df was sorted by timestamp
-        j = 0
-        for in_ts in in_times:
-            # Advance j to the first outgoing tx at or after in_ts
-            while j < len(out_times) and out_times[j] < in_ts:
-                j += 1
-
-            # Check subsequent outgoing transactions within window
-            k = j
-            while k < len(out_times):
-                dwell = (out_times[k] - in_ts).total_seconds() / 60.0
-                if dwell > RAPID_MOVEMENT_MINUTES:
-                    break
-                if dwell >= 0:
-                    rapid_count += 1
-                    if min_dwell is None or dwell < min_dwell:
-                        min_dwell = dwell
-                k += 1
-
-        if rapid_count > 0 and min_dwell is not None:
-            flagged[acc] = {
-                "min_dwell_minutes": round(min_dwell, 1),
-                "rapid_count": rapid_count,
-            }
+    flagged = {
+        acc: {
+            "min_dwell_minutes": round(float(m), 1),
+            "rapid_count": int(c),
+        }
+        for acc, m, c in zip(agg.index, agg["min_dwell"], agg["rapid_count"])
+    }
 
     log.info("Rapid movement detection: %d accounts flagged", len(flagged))
     return flagged
@@ -22,8 +22,14 @@ import logging
 from typing import Dict, List, Set
 
 import networkx as nx
+import numpy as np
 import pandas as pd
 
+try:
+    import igraph as ig
+except ImportError:  # pragma: no cover - igraph is an optional accelerator
+    ig = None
+
 from .config import (
     SCORE_CYCLE_3, SCORE_CYCLE_4, SCORE_CYCLE_5,
     SCORE_FAN_IN, SCORE_FAN_OUT, SCORE_SHELL,
@@ -46,25 +52,68 @@ PATTERN_SCORES: Dict[str, float] = {
     "round_trip":     SCORE_ROUND_TRIP,
 }
 
-# Graphs larger than this skip betweenness centrality (expensive)
-_CENTRALITY_MAX_NODES = 500
+# Pattern-name bit registry for the SoA scoring pass: each detected pattern
+# gets one bit in a uint64 mask so per-account pattern sets accumulate via
+# bitwise-or instead of Python set objects. Known names register at import;
+# unknown ring patterns are assigned bits on first sight.
+_PATTERN_BIT_NAMES: List[str] = []
+_PATTERN_BITS: Dict[str, int] = {}
+
+
+def _pattern_bit(name: str) -> np.uint64:
+    """Return (registering if needed) the bitmask bit for a pattern name."""
+    bit = _PATTERN_BITS.get(name)
+    if bit is None:
+        if len(_PATTERN_BIT_NAMES) >= 64:  # out of bits — ignore, never raise
+            return np.uint64(0)
+        bit = 1 << len(_PATTERN_BIT_NAMES)
+        _PATTERN_BITS[name] = bit
+        _PATTERN_BIT_NAMES.append(name)
+    return np.uint64(bit)
+
+
+def _patterns_from_bits(mask: int) -> List[str]:
+    """Decode a pattern bitmask back to the sorted list of pattern names."""
+    return sorted(
+        name for i, name in enumerate(_PATTERN_BIT_NAMES) if mask >> i & 1
+    )
+
+
+for _name in (
+    "cycle_length_3", "cycle_length_4", "cycle_length_5",
+    "fan_in", "fan_out", "shell_chain", "round_trip",
+    "multi_ring", "high_velocity", "amount_anomaly",
+    "rapid_movement", "structuring",
+):
+    _pattern_bit(_name)
+
+
+# Graphs larger than this skip betweenness centrality (expensive).
+# igraph's C++ SSSP handles far larger graphs than NetworkX's pure-Python
+# implementation, so the ceiling depends on which engine is available.
+_CENTRALITY_MAX_NODES = 50_000 if ig is not None else 500
+# Pivot-sample size for the NetworkX fallback (approximate betweenness).
+_CENTRALITY_SAMPLE_K = 100
 
 
 def _velocity_accounts(df: pd.DataFrame) -> Set[str]:
     """Return account IDs whose average tx/day exceeds the threshold."""
     if df.empty:
         return set()
+    # Integer ns arithmetic on the cached ts_ns column (no Timedelta boxing)
+    ts_ns = (
+        df["ts_ns"] if "ts_ns" in df.columns
+        else df["timestamp"].astype("datetime64[ns]").astype("int64")
+    )
     span_days = max(
-        (df["timestamp"].max() - df["timestamp"].min()).total_seconds() / 86400,
+        float(ts_ns.max() - ts_ns.min()) / 86_400_000_000_000,
         1.0,
     )
-    tx_counts = (
-        pd.concat([
-            df["sender_id"].value_counts(),
-            df["receiver_id"].value_counts(),
-        ])
-        .groupby(level=0).sum()
-    )
+    # One hash pass over the stacked id columns — no per-side value_counts
+    # followed by a groupby-sum re-hash.
+    tx_counts = pd.concat(
+        [df["sender_id"], df["receiver_id"]], ignore_index=True
+    ).value_counts()
     per_day = tx_counts / span_days
     flagged = set(per_day[per_day > HIGH_VELOCITY_TX_PER_DAY].index)
     log.info("High-velocity accounts: %d", len(flagged))
@@ -76,12 +125,21 @@ def _centrality_scores(G: nx.DiGraph) -> Dict[str, float]:
     Compute normalised betweenness centrality (0-1) for nodes.
     Returns empty dict if graph is too large to compute quickly.
     """
-    if G.number_of_nodes() > _CENTRALITY_MAX_NODES:
+    n = G.number_of_nodes()
+    if n > _CENTRALITY_MAX_NODES:
         log.info("Graph too large for centrality computation; skipping.")
         return {}
     try:
-        raw = nx.betweenness_centrality(G, normalized=True)
-        return raw
+        if ig is not None and G.number_of_edges() > 0:
+            # C++ betweenness; unnormalised is fine — the scoring bonus only
+            # uses values relative to the per-request maximum.
+            g = ig.Graph.TupleList(G.edges(), directed=True)
+            return dict(zip(g.vs["name"], g.betweenness(directed=True)))
+        # NetworkX fallback: pivot-sampled approximation keeps the pure-Python
+        # path usable at the 500-node ceiling.
+        return nx.betweenness_centrality(
+            G, normalized=True, k=min(_CENTRALITY_SAMPLE_K, n), seed=42
+        )
     except Exception as exc:
         log.warning("Centrality computation failed: %s", exc)
         return {}
@@ -161,94 +219,140 @@ def calculate_scores(
 
     vel_accounts = _velocity_accounts(df)
     centrality   = _centrality_scores(G) if G is not None else {}
-    data: Dict[str, Dict] = {}
 
-    def _entry(acc: str) -> Dict:
-        if acc not in data:
-            data[acc] = {"score": 0.0, "patterns": set(), "ring_ids": [], "_extra": {}}
-        return data[acc]
-
-    # 1. Pattern contributions (ring-based)
-    for ring in rings:
-        ring_id    = ring["ring_id"]
-        pattern    = ring["pattern"]
-        base_score = PATTERN_SCORES.get(pattern, 10.0)
-        hub        = ring.get("hub")  # set by smurf_detector for fan_in/fan_out
-        # shell_intermediaries: only the pass-through nodes (not source/destination)
-        shell_intermediaries = set(ring.get("shell_intermediaries", []))
-
-        for acc in ring["members"]:
-            e = _entry(acc)
-            if ring_id not in e["ring_ids"]:
-                e["ring_ids"].append(ring_id)
-            # For fan patterns, only the hub (aggregator/disperser) receives the score
-            # and pattern label. Spokes (employees, ordinary payers) are ring members
-            # only — they are NOT independently suspicious.
-            if pattern in ("fan_in", "fan_out"):
-                if acc == hub:
-                    e["score"] += base_score
-                    e["patterns"].add(pattern)
-            # For shell chains, ring members ARE the shell intermediaries (Option A).
-            # Source and destination nodes are excluded from members entirely, so
-            # every member here is a confirmed pass-through shell account.
-            elif pattern == "shell_chain":
-                e["score"] += base_score
-                e["patterns"].add(pattern)
-            else:
-                e["score"] += base_score
-                e["patterns"].add(pattern)
-
-    # 2. Multi-ring bonus (account belongs to more than one ring)
-    for acc, e in data.items():
-        extra_rings = max(len(e["ring_ids"]) - 1, 0)
-        if extra_rings > 0:
-            e["score"] += SCORE_MULTI_RING_BONUS * extra_rings
-            e["patterns"].add("multi_ring")
+    # ── Account universe (SoA layout) ──────────────────────────────────────────
+    # Scores live in one float array and detected patterns in one uint64
+    # bitmask array, both indexed by factorised account code; the dict-of-dicts
+    # return shape is materialised once at the end. This avoids ~5 small
+    # Python objects per account during accumulation.
+    if rings:
+        member_counts = np.fromiter(
+            (len(r["members"]) for r in rings), dtype=np.int64, count=len(rings)
+        )
+        ring_idx = np.repeat(np.arange(len(rings)), member_counts)
+        flat_members = np.fromiter(
+            (m for r in rings for m in r["members"]),
+            dtype=object, count=int(member_counts.sum()),
+        )
+    else:
+        ring_idx = np.empty(0, dtype=np.int64)
+        flat_members = np.empty(0, dtype=object)
+
+    def _obj_array(it, count: int) -> np.ndarray:
+        return np.fromiter(it, dtype=object, count=count)
+
+    vel_arr    = _obj_array(vel_accounts, len(vel_accounts))
+    anom_arr   = _obj_array(anomaly_accounts, len(anomaly_accounts))
+    rapid_arr  = _obj_array(rapid_accounts, len(rapid_accounts))
+    struct_arr = _obj_array(structuring_accounts, len(structuring_accounts))
+
+    all_ids = np.concatenate([flat_members, vel_arr, anom_arr, rapid_arr, struct_arr])
+    if all_ids.size == 0:
+        log.info("Scoring complete: 0 accounts scored")
+        return {}
+
+    codes_all, accounts = pd.factorize(all_ids, sort=False)
+    n = len(accounts)
+    bound = len(flat_members)
+    m_codes = codes_all[:bound]
+    vel_codes = codes_all[bound:bound + len(vel_arr)]
+    bound += len(vel_arr)
+    anom_codes = codes_all[bound:bound + len(anom_arr)]
+    bound += len(anom_arr)
+    rapid_codes = codes_all[bound:bound + len(rapid_arr)]
+    struct_codes = codes_all[bound + len(rapid_arr):]
+
+    scores = np.zeros(n)
+    pat_bits = np.zeros(n, dtype=np.uint64)
+
+    # 1. Pattern contributions (ring-based) — one scatter-add over member
+    # codes. For fan patterns only the hub (aggregator/disperser) receives the
+    # score and pattern label; spokes (employees, ordinary payers) are ring
+    # members only, NOT independently suspicious. Shell-chain members are
+    # already just the pass-through intermediaries (Option A), so they all
+    # score.
+    ring_ids_by_acc: Dict[str, list] = {}
+    if rings:
+        base = np.fromiter(
+            (PATTERN_SCORES.get(r["pattern"], 10.0) for r in rings),
+            dtype=np.float64, count=len(rings),
+        )
+        is_fan = np.fromiter(
+            (r["pattern"] in ("fan_in", "fan_out") for r in rings),
+            dtype=bool, count=len(rings),
+        )
+        hubs = np.fromiter(
+            (r.get("hub") for r in rings), dtype=object, count=len(rings)
+        )
+        ring_bits = np.fromiter(
+            (_pattern_bit(r["pattern"]) for r in rings),
+            dtype=np.uint64, count=len(rings),
+        )
+        contributes = ~is_fan[ring_idx] | (flat_members == hubs[ring_idx])
+
+        np.add.at(scores, m_codes[contributes], base[ring_idx[contributes]])
+        np.bitwise_or.at(pat_bits, m_codes[contributes], ring_bits[ring_idx[contributes]])
+
+        # Ordered ring-id lists must stay Python — they feed the payload.
+        for ring in rings:
+            ring_id = ring["ring_id"]
+            for acc in ring["members"]:
+                ring_ids_by_acc.setdefault(acc, []).append(ring_id)
+
+        # 2. Multi-ring bonus (account belongs to more than one ring)
+        extra_rings = np.maximum(np.bincount(m_codes, minlength=n) - 1, 0)
+        scores += SCORE_MULTI_RING_BONUS * extra_rings
+        pat_bits[extra_rings > 0] |= _pattern_bit("multi_ring")
 
     # 3. High-velocity bonus
-    for acc in vel_accounts:
-        e = _entry(acc)
-        e["score"] += SCORE_HIGH_VELOCITY
-        e["patterns"].add("high_velocity")
+    scores[vel_codes] += SCORE_HIGH_VELOCITY
+    pat_bits[vel_codes] |= _pattern_bit("high_velocity")
 
-    # 4. Network centrality bonus (up to SCORE_CENTRALITY_MAX points)
+    # 4. Network centrality bonus (up to SCORE_CENTRALITY_MAX points) — only
+    # for accounts already scored by rings or velocity, matching the stage at
+    # which the bonus was historically applied.
     if centrality:
-        max_c = max(centrality.values()) if centrality else 1.0
-        for acc, c_val in centrality.items():
-            if acc in data:
-                bonus = (c_val / max_c) * SCORE_CENTRALITY_MAX if max_c > 0 else 0
-                data[acc]["score"] += bonus
-
-    # 5. Amount anomaly bonus
-    for acc in anomaly_accounts:
-        e = _entry(acc)
-        e["score"] += SCORE_AMOUNT_ANOMALY
-        e["patterns"].add("amount_anomaly")
-
-    # 6. Rapid movement bonus
-    for acc, info in rapid_accounts.items():
-        e = _entry(acc)
-        e["score"] += SCORE_RAPID_MOVEMENT
-        e["patterns"].add("rapid_movement")
-        e["_extra"]["min_dwell_minutes"] = info.get("min_dwell_minutes")
-        e["_extra"]["rapid_count"] = info.get("rapid_count")
-
-    # 7. Structuring bonus
-    for acc, info in structuring_accounts.items():
-        e = _entry(acc)
-        e["score"] += SCORE_STRUCTURING
-        e["patterns"].add("structuring")
-        e["_extra"]["structured_tx_count"] = info.get("structured_tx_count")
-        e["_extra"]["avg_amount"] = info.get("avg_amount")
-
-    # 8. Normalise and build explanations
-    for acc, e in data.items():
-        e["score"]    = float(min(round(e["score"], 1), 100.0))  # always a float
-        e["patterns"] = sorted(e["patterns"])   # deterministic order
-        e["risk_explanation"] = _build_risk_explanation(
-            e["patterns"], e["ring_ids"], e.get("_extra", {})
-        )
-        del e["_extra"]  # internal only, not exposed
+        max_c = max(centrality.values())
+        if max_c > 0:
+            eligible = np.zeros(n, dtype=bool)
+            eligible[m_codes] = True
+            eligible[vel_codes] = True
+            cent = np.fromiter(
+                (centrality.get(acc, 0.0) for acc in accounts),
+                dtype=np.float64, count=n,
+            )
+            scores += np.where(eligible, (cent / max_c) * SCORE_CENTRALITY_MAX, 0.0)
+
+    # 5–7. Amount anomaly / rapid movement / structuring bonuses
+    scores[anom_codes] += SCORE_AMOUNT_ANOMALY
+    pat_bits[anom_codes] |= _pattern_bit("amount_anomaly")
+    scores[rapid_codes] += SCORE_RAPID_MOVEMENT
+    pat_bits[rapid_codes] |= _pattern_bit("rapid_movement")
+    scores[struct_codes] += SCORE_STRUCTURING
+    pat_bits[struct_codes] |= _pattern_bit("structuring")
+
+    # 8. Normalise (vectorised) and materialise the boundary dict
+    scores = np.minimum(scores.round(1), 100.0)
+
+    data: Dict[str, Dict] = {}
+    for i, acc in enumerate(accounts):
+        patterns = _patterns_from_bits(int(pat_bits[i]))
+        ring_ids = ring_ids_by_acc.get(acc, [])
+        extra: Dict = {}
+        if acc in rapid_accounts:
+            info = rapid_accounts[acc]
+            extra["min_dwell_minutes"] = info.get("min_dwell_minutes")
+            extra["rapid_count"] = info.get("rapid_count")
+        if acc in structuring_accounts:
+            info = structuring_accounts[acc]
+            extra["structured_tx_count"] = info.get("structured_tx_count")
+            extra["avg_amount"] = info.get("avg_amount")
+        data[acc] = {
+            "score": float(scores[i]),
+            "patterns": patterns,
+            "ring_ids": ring_ids,
+            "risk_explanation": _build_risk_explanation(patterns, ring_ids, extra),
+        }
 
     log.info("Scoring complete: %d accounts scored", len(data))
     return data
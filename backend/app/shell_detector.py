@@ -29,6 +29,12 @@ terminates (potentially recording a chain) whenever it reaches a non-shell node
 or exhausts extension depth.
 
 Hard cap MAX_SHELL_CHAINS prevents excessive output.
+
+With Numba available and the CSR adjacency cached by build_graph, the whole
+traversal runs as a compiled kernel over int32 node ids; the Python DFS below
+remains as the fallback. When the chain cap binds, the two paths may keep a
+different subset of chains (the kept subset was always traversal-order
+dependent); under the cap they find the identical chain set.
 """
 from __future__ import annotations
 
@@ -36,11 +42,90 @@ import logging
 from typing import List, Dict
 
 import networkx as nx
+import numpy as np
 
 from .config import SHELL_MAX_TX, SHELL_MIN_CHAIN, SHELL_MAX_CHAIN, MAX_SHELL_CHAINS
 
+try:
+    import numba
+except ImportError:  # pragma: no cover - numba is an optional accelerator
+    numba = None
+
 log = logging.getLogger(__name__)
 
+# Emit head-room before Python-side dedup truncates to MAX_SHELL_CHAINS.
+_EMIT_FACTOR = 8
+
+
+if numba is not None:
+
+    @numba.njit(cache=True)
+    def _shell_dfs(indptr, indices, shell_mask, reach, min_hops, max_hops, max_emit):  # pragma: no cover - compiled
+        """
+        Iterative DFS over the CSR adjacency emitting every path whose
+        interior nodes are all shells. Returns (paths, lengths, count) where
+        paths[i, :lengths[i]] holds the full node-id path of emission i.
+        """
+        n = indptr.shape[0] - 1
+        max_len = max_hops + 1
+        paths = np.empty((max_emit, max_len), dtype=np.int64)
+        lengths = np.zeros(max_emit, dtype=np.int64)
+        emitted = 0
+
+        path_buf = np.empty(max_len, dtype=np.int64)
+        # Explicit stack of (node, depth); path_buf[d] is set when popping.
+        stack_node = np.empty(n * max_len + 1, dtype=np.int64)
+        stack_depth = np.empty(n * max_len + 1, dtype=np.int64)
+
+        for source in range(n):
+            # Only sources with at least one shell successor start a walk.
+            has_shell_succ = False
+            for k in range(indptr[source], indptr[source + 1]):
+                if shell_mask[indices[k]]:
+                    has_shell_succ = True
+                    break
+            if not has_shell_succ:
+                continue
+
+            path_buf[0] = source
+            top = 0
+            for k in range(indptr[source], indptr[source + 1]):
+                nbr = indices[k]
+                # reach[] prunes branches whose longest possible continuation
+                # can never form a chain of min_hops.
+                if shell_mask[nbr] and 1 + reach[nbr] >= min_hops:
+                    stack_node[top] = nbr
+                    stack_depth[top] = 1
+                    top += 1
+
+            while top > 0:
+                top -= 1
+                node = stack_node[top]
+                depth = stack_depth[top]
+                path_buf[depth] = node
+
+                for k in range(indptr[node], indptr[node + 1]):
+                    nbr = indices[k]
+                    new_hops = depth + 1
+                    if new_hops >= min_hops:
+                        if emitted >= max_emit:
+                            return paths, lengths, emitted
+                        for i in range(depth + 1):
+                            paths[emitted, i] = path_buf[i]
+                        paths[emitted, depth + 1] = nbr
+                        lengths[emitted] = depth + 2
+                        emitted += 1
+                    if (
+                        shell_mask[nbr]
+                        and new_hops < max_hops
+                        and new_hops + reach[nbr] >= min_hops
+                    ):
+                        stack_node[top] = nbr
+                        stack_depth[top] = new_hops
+                        top += 1
+
+        return paths, lengths, emitted
+
 
 def detect_shell_networks(G: nx.DiGraph) -> List[Dict]:
     """
@@ -68,11 +153,16 @@ def detect_shell_networks(G: nx.DiGraph) -> List[Dict]:
         if len(component) > 1:
             cycle_nodes.update(component)
 
+    # Bind the raw adjacency once — every membership/successor test below is
+    # then a plain dict access instead of an AdjacencyView / degree-view call.
+    adj = G._adj
+    pred = G._pred
+
     shell_nodes: set = {
         n for n, d in G.nodes(data=True)
         if d.get("tx_count", 0) <= SHELL_MAX_TX
-        and G.in_degree(n) > 0
-        and G.out_degree(n) > 0
+        and pred[n]
+        and adj[n]
         and n not in cycle_nodes
     }
 
@@ -91,44 +181,119 @@ def detect_shell_networks(G: nx.DiGraph) -> List[Dict]:
         log.info("Shell detection: 0 chains found")
         return rings
 
+    # ── Reachability DP (prune dead branches) ─────────────────────────────────
+    # maxext[n] = longest possible continuation (in hops) once a path stands
+    # on shell node n: one edge to any successor, plus the best shell-only
+    # extension. Computed in reverse topological order of the shell-induced
+    # DAG; branches whose hops + maxext can never reach SHELL_MIN_CHAIN are
+    # skipped entirely.
+    indeg = {n: 0 for n in shell_nodes}
+    for n in shell_nodes:
+        for v in adj[n]:
+            if v in shell_nodes:
+                indeg[v] += 1
+    queue = [n for n, d in indeg.items() if d == 0]
+    topo: list = []
+    while queue:
+        n = queue.pop()
+        topo.append(n)
+        for v in adj[n]:
+            if v in shell_nodes:
+                indeg[v] -= 1
+                if indeg[v] == 0:
+                    queue.append(v)
+    maxext: dict = {}
+    for n in reversed(topo):
+        best = 0
+        for v in adj[n]:
+            if v in shell_nodes:
+                ext = maxext[v]
+                if ext > best:
+                    best = ext
+        maxext[n] = (1 + best) if adj[n] else 0
+
+    # ── Compiled DFS over the cached CSR adjacency ────────────────────────────
+    csr = G.graph.get("_csr")
+    if numba is not None and csr is not None:
+        adj_mat, node_index = csr
+        shell_mask = np.zeros(len(node_index), dtype=np.bool_)
+        shell_idx = node_index.get_indexer(list(shell_nodes))
+        shell_mask[shell_idx] = True
+        reach = np.zeros(len(node_index), dtype=np.int64)
+        reach[node_index.get_indexer(list(maxext))] = np.fromiter(
+            maxext.values(), dtype=np.int64, count=len(maxext)
+        )
+
+        paths, lengths, emitted = _shell_dfs(
+            adj_mat.indptr.astype(np.int64),
+            adj_mat.indices.astype(np.int64),
+            shell_mask,
+            reach,
+            SHELL_MIN_CHAIN,
+            SHELL_MAX_CHAIN,
+            MAX_SHELL_CHAINS * _EMIT_FACTOR,
+        )
+        ids = np.asarray(node_index, dtype=object)
+        for e in range(emitted):
+            if chain_count >= MAX_SHELL_CHAINS:
+                log.warning("Shell chain cap (%d) reached.", MAX_SHELL_CHAINS)
+                break
+            length = int(lengths[e])
+            intermediaries = list(ids[paths[e, 1:length - 1]])
+            key = tuple(intermediaries)
+            if key in seen_paths:
+                continue
+            seen_paths.add(key)
+            rings.append({
+                # members = only the shell intermediaries (Option A).
+                # Source and destination are NOT flagged as suspicious;
+                # they are entry/exit nodes, not the shell accounts.
+                "members": intermediaries,
+                "pattern": "shell_chain",
+                "chain_length": length - 1,
+                "shell_intermediaries": intermediaries,
+            })
+            chain_count += 1
+
+        log.info("Shell detection: %d chains found", len(rings))
+        return rings
+
     # ── Iterative DFS ─────────────────────────────────────────────────────────
     # Start from every node that has at least one shell successor.
     candidate_sources = [
         n for n in G.nodes()
-        if any(nbr in shell_nodes for nbr in G.successors(n))
+        if any(nbr in shell_nodes for nbr in adj[n])
     ]
 
+    # The walk below only ever extends through shell nodes, and the shell-
+    # induced subgraph is necessarily a DAG: any cycle re-entering the path
+    # (including back into the source) would put its shell intermediaries
+    # inside an SCC of size > 1, which the filter above excludes. So no
+    # per-frame visited set is needed, and every recorded path's
+    # intermediaries are shells by construction.
     for source in candidate_sources:
         if chain_count >= MAX_SHELL_CHAINS:
             log.warning("Shell chain cap (%d) reached.", MAX_SHELL_CHAINS)
             break
 
-        # Stack: (current_path, visited_set)
         stack = [
-            ([source, nbr], {source, nbr})
-            for nbr in G.successors(source)
-            if nbr in shell_nodes
+            [source, nbr]
+            for nbr in adj[source]
+            if nbr in shell_nodes and 1 + maxext[nbr] >= SHELL_MIN_CHAIN
         ]
 
         while stack and chain_count < MAX_SHELL_CHAINS:
-            path, visited = stack.pop()
+            path = stack.pop()
             current = path[-1]
             n_hops = len(path) - 1
 
-            for nbr in G.successors(current):
-                if nbr in visited:
-                    continue
-
+            for nbr in adj[current]:
                 new_path = path + [nbr]
                 new_hops = n_hops + 1
-                intermediaries = new_path[1:-1]  # nodes between source and nbr
 
-                # Always check if we have a valid chain length and all intermediaries are shells
-                if (
-                    new_hops >= SHELL_MIN_CHAIN
-                    and all(n in shell_nodes for n in intermediaries)
-                ):
-                    key = tuple(intermediaries)  # deduplicate by intermediary set
+                if new_hops >= SHELL_MIN_CHAIN:
+                    intermediaries = new_path[1:-1]  # nodes between source and nbr
+                    key = tuple(intermediaries)  # deduplicate by intermediary chain
                     if key not in seen_paths:
                         seen_paths.add(key)
                         rings.append({
@@ -141,10 +306,17 @@ def detect_shell_networks(G: nx.DiGraph) -> List[Dict]:
                             "shell_intermediaries": intermediaries,
                         })
                         chain_count += 1
+                        if chain_count >= MAX_SHELL_CHAINS:
+                            break  # stop this branch immediately at the cap
 
-                # Continue extending through shell nodes (up to depth limit)
-                if nbr in shell_nodes and new_hops < SHELL_MAX_CHAIN:
-                    stack.append((new_path, visited | {nbr}))
+                # Continue extending through shell nodes (up to depth limit),
+                # skipping branches that can never reach SHELL_MIN_CHAIN
+                if (
+                    nbr in shell_nodes
+                    and new_hops < SHELL_MAX_CHAIN
+                    and new_hops + maxext[nbr] >= SHELL_MIN_CHAIN
+                ):
+                    stack.append(new_path)
 
     log.info("Shell detection: %d chains found", len(rings))
     return rings
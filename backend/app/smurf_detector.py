@@ -34,9 +34,9 @@ Two-pointer sliding window: O(n) per group instead of O(n²).
 from __future__ import annotations
 
 import logging
-from datetime import timedelta
 from typing import List, Dict, Set
 
+import numpy as np
 import pandas as pd
 
 from .config import (
@@ -46,9 +46,67 @@ from .config import (
     PAYROLL_BATCH_SECONDS,
 )
 
+try:
+    import numba
+except ImportError:  # pragma: no cover - numba is an optional accelerator
+    numba = None
+
 log = logging.getLogger(__name__)
 
 
+if numba is not None:
+
+    @numba.njit(cache=True)
+    def _scan_groups(ts, cps, starts, ends, hub_cp_codes, skip,
+                     window_ns, threshold, counts, touched, out_left, out_right):  # pragma: no cover - compiled
+        """
+        One compiled pass over ALL groups of one fan direction (groups are
+        contiguous slices of the hub-sorted ts/cps arrays). For each group the
+        classic two-pointer window runs until `threshold` unique counterparties
+        (hub excluded) share a window; out_left/out_right record the window
+        bounds relative to the group slice, or -1. The scratch counts array is
+        shared across groups, with touched entries zeroed between them.
+        """
+        for g in range(starts.shape[0]):
+            out_left[g] = -1
+            out_right[g] = -1
+            if skip[g]:
+                continue
+            start = starts[g]
+            end = ends[g]
+            hub = hub_cp_codes[g]
+            if end - start < threshold:
+                continue
+
+            left = start
+            uniq = 0
+            n_touched = 0
+            for right in range(start, end):
+                c = cps[right]
+                if c != hub:
+                    if counts[c] == 0:
+                        uniq += 1
+                        touched[n_touched] = c
+                        n_touched += 1
+                    counts[c] += 1
+
+                while ts[right] - ts[left] > window_ns:
+                    lc = cps[left]
+                    if lc != hub:
+                        counts[lc] -= 1
+                        if counts[lc] == 0:
+                            uniq -= 1
+                    left += 1
+
+                if uniq >= threshold:
+                    out_left[g] = left - start
+                    out_right[g] = right - start
+                    break
+
+            for i in range(n_touched):
+                counts[touched[i]] = 0
+
+
 def _merchant_receivers(df: pd.DataFrame) -> Set[str]:
     """
     Return receiver IDs that look like legitimate merchants.
@@ -61,7 +119,7 @@ def _merchant_receivers(df: pd.DataFrame) -> Set[str]:
     """
     # pandas groupby std() uses ddof=1 (sample std) by default — consistent with
     # the previous per-group amounts.std(ddof=1) calculation.
-    stats = df.groupby("receiver_id")["amount"].agg(
+    stats = df.groupby("receiver_id", observed=True)["amount"].agg(
         mean_amt="mean",
         std_amt="std",   # ddof=1
         count_amt="count",
@@ -85,10 +143,15 @@ def _payroll_senders(df: pd.DataFrame) -> Set[str]:
 
     Fully vectorised — no Python-level for-loop over groups.
     """
-    ts_stats = df.groupby("sender_id")["timestamp"].agg(["min", "max", "count"])
+    ts_col = "ts_ns" if "ts_ns" in df.columns else "timestamp"
+    ts_stats = df.groupby("sender_id", observed=True)[ts_col].agg(["min", "max", "count"])
     ts_stats = ts_stats[ts_stats["count"] >= 2]
-    # Span in seconds between first and last outgoing tx per sender
-    ts_stats["span_s"] = (ts_stats["max"] - ts_stats["min"]).dt.total_seconds()
+    # Span in seconds between first and last outgoing tx per sender —
+    # integer ns arithmetic on the cached ts_ns column when available.
+    if ts_col == "ts_ns":
+        ts_stats["span_s"] = (ts_stats["max"] - ts_stats["min"]) / 1_000_000_000
+    else:
+        ts_stats["span_s"] = (ts_stats["max"] - ts_stats["min"]).dt.total_seconds()
     excluded = set(ts_stats[ts_stats["span_s"] <= PAYROLL_BATCH_SECONDS].index)
     if excluded:
         log.info("Fan-out payroll exclusion (batch timestamps): %d accounts", len(excluded))
@@ -96,21 +159,26 @@ def _payroll_senders(df: pd.DataFrame) -> Set[str]:
 
 
 def _sliding_window_unique(
-    sorted_times: list,
-    sorted_counterparts: list,
+    sorted_times,
+    sorted_counterparts,
     hub: str,
-    window_td: timedelta,
+    window_ns: int,
     threshold: int,
 ) -> tuple:
     """
     Two-pointer sliding window to find any window with >= threshold unique
     counterparties (excluding `hub` itself).
 
-    Returns (triggered: bool, unique_counterparts: set)
+    `sorted_times` is an int64 ns array; the window bound compares as plain
+    integers.
+
+    Returns (triggered: bool, unique_counterparts) — the counterparts come
+    back as the window's live counter dict (its keys are already the unique
+    set; no defensive copy is made).
     """
     n = len(sorted_times)
     if n < threshold:
-        return False, set()
+        return False, {}
 
     left = 0
     window: dict = {}
@@ -120,7 +188,7 @@ def _sliding_window_unique(
         if cp != hub:
             window[cp] = window.get(cp, 0) + 1
 
-        while sorted_times[right] - sorted_times[left] > window_td:
+        while sorted_times[right] - sorted_times[left] > window_ns:
             lcp = sorted_counterparts[left]
             if lcp != hub:
                 window[lcp] -= 1
@@ -129,9 +197,9 @@ def _sliding_window_unique(
             left += 1
 
         if len(window) >= threshold:
-            return True, set(window.keys())
+            return True, window
 
-    return False, set()
+    return False, {}
 
 
 def detect_smurfing(df: pd.DataFrame) -> List[Dict]:
@@ -148,136 +216,103 @@ def detect_smurfing(df: pd.DataFrame) -> List[Dict]:
     """
     rings: List[Dict] = []
     seen_keys: set = set()
-    window_td = timedelta(hours=SMURF_WINDOW_HOURS)
+    window_ns = SMURF_WINDOW_HOURS * 3_600_000_000_000
 
     excluded_fan_in = _merchant_receivers(df)
     excluded_fan_out = _payroll_senders(df)
 
-    df_s = df.sort_values("timestamp")
-
-    # ── Fan-in: many senders → one receiver ────────────────────────────────
-    for receiver, grp in df_s.groupby("receiver_id"):
-        if receiver in excluded_fan_in:
-            continue
-        grp = grp.sort_values("timestamp")
-        times   = grp["timestamp"].tolist()
-        senders = grp["sender_id"].tolist()
-
-        triggered, window_senders = _sliding_window_unique(
-            times, senders, receiver, window_td, FAN_THRESHOLD
-        )
-        if triggered:
-            key = ("fan_in", receiver)
-            if key not in seen_keys:
-                seen_keys.add(key)
-                members = sorted(window_senders) + [receiver]
+    # One stable global sort (skipped when the parser already delivered the
+    # frame in time order); groupby preserves row order within each group,
+    # so the old per-group re-sort was redundant. Timestamps travel as int64
+    # ns arrays (no per-element Timestamp boxing in the window scan).
+    if df["timestamp"].is_monotonic_increasing:
+        df_s = df
+    else:
+        df_s = df.sort_values("timestamp", kind="mergesort")
+    if "ts_ns" not in df_s.columns:
+        df_s = df_s.assign(ts_ns=df_s["timestamp"].astype("datetime64[ns]").astype("int64"))
+
+    if numba is not None:
+        # Factorise both id columns once. Groups are then iterated as slices
+        # of a stable argsort (boundary indices) — no per-group DataFrame is
+        # ever allocated — and the compiled scan indexes a single scratch
+        # counts array shared by every group.
+        ts_arr = df_s["ts_ns"].to_numpy()
+        s_codes, s_uniq = pd.factorize(df_s["sender_id"], sort=False)
+        r_codes, r_uniq = pd.factorize(df_s["receiver_id"], sort=False)
+        s_codes = s_codes.astype(np.int64)
+        r_codes = r_codes.astype(np.int64)
+        s_uniq = np.asarray(s_uniq, dtype=object)
+        r_uniq = np.asarray(r_uniq, dtype=object)
+        s_pos = {v: i for i, v in enumerate(s_uniq)}
+        r_pos = {v: i for i, v in enumerate(r_uniq)}
+
+        def _scan_side(hub_codes, hub_uniq, cp_codes, cp_uniq, cp_pos,
+                       excluded, pattern, hub_type):
+            # Stable argsort keeps the global timestamp order inside groups;
+            # gathering once makes every group a contiguous slice for the
+            # kernel.
+            order = np.argsort(hub_codes, kind="stable")
+            sorted_hub = hub_codes[order]
+            ts_o = ts_arr[order]
+            cp_o = cp_codes[order]
+            bounds = np.flatnonzero(np.diff(sorted_hub)) + 1
+            starts = np.concatenate(([0], bounds))
+            ends = np.concatenate((bounds, [len(sorted_hub)]))
+
+            hub_vals = hub_uniq[sorted_hub[starts]]
+            skip = np.fromiter(
+                (h in excluded for h in hub_vals), dtype=np.bool_, count=len(hub_vals)
+            )
+            hub_cp_codes = np.fromiter(
+                (cp_pos.get(h, -1) for h in hub_vals),
+                dtype=np.int64, count=len(hub_vals),
+            )
+
+            counts = np.zeros(len(cp_uniq), dtype=np.int64)
+            touched = np.empty(max(len(cp_o), 1), dtype=np.int64)
+            out_left = np.empty(len(starts), dtype=np.int64)
+            out_right = np.empty(len(starts), dtype=np.int64)
+            _scan_groups(
+                ts_o, cp_o, starts, ends, hub_cp_codes, skip,
+                window_ns, FAN_THRESHOLD, counts, touched, out_left, out_right,
+            )
+
+            for g in np.flatnonzero(out_left >= 0):
+                start = starts[g]
+                window_codes = np.unique(
+                    cp_o[start + out_left[g]:start + out_right[g] + 1]
+                )
+                window_codes = window_codes[window_codes != hub_cp_codes[g]]
+                hub = hub_vals[g]
+                counterparts = sorted(cp_uniq[window_codes])
+                members = (
+                    counterparts + [hub] if pattern == "fan_in"
+                    else [hub] + counterparts
+                )
                 rings.append({
                     "members": members,
-                    "pattern": "fan_in",
-                    "hub": receiver,
-                    "hub_type": "aggregator",
+                    "pattern": pattern,
+                    "hub": hub,
+                    "hub_type": hub_type,
                     "member_count": len(members),
                 })
 
-    # ── Fan-out: one sender → many receivers ────────────────────────────────
-    for sender, grp in df_s.groupby("sender_id"):
-        if sender in excluded_fan_out:
-            continue
-        grp = grp.sort_values("timestamp")
-        times     = grp["timestamp"].tolist()
-        receivers = grp["receiver_id"].tolist()
-
-        triggered, window_receivers = _sliding_window_unique(
-            times, receivers, sender, window_td, FAN_THRESHOLD
-        )
-        if triggered:
-            key = ("fan_out", sender)
-            if key not in seen_keys:
-                seen_keys.add(key)
-                members = [sender] + sorted(window_receivers)
-                rings.append({
-                    "members": members,
-                    "pattern": "fan_out",
-                    "hub": sender,
-                    "hub_type": "disperser",
-                    "member_count": len(members),
-                })
-
-    log.info("Smurfing detection: %d rings found (fan-in + fan-out)", len(rings))
-    return rings
-
-
-
-def _sliding_window_unique(
-    sorted_times: list,
-    sorted_counterparts: list,
-    hub: str,
-    window_td: timedelta,
-    threshold: int,
-) -> tuple:
-    """
-    Two-pointer sliding window to find any window with >= threshold unique
-    counterparties (excluding `hub` itself).
-
-    Returns (triggered: bool, unique_counterparts: set)
-    """
-    n = len(sorted_times)
-    if n < threshold:
-        return False, set()
-
-    left = 0
-    window: dict = {}
-
-    for right in range(n):
-        cp = sorted_counterparts[right]
-        if cp != hub:
-            window[cp] = window.get(cp, 0) + 1
-
-        while sorted_times[right] - sorted_times[left] > window_td:
-            lcp = sorted_counterparts[left]
-            if lcp != hub:
-                window[lcp] -= 1
-                if window[lcp] == 0:
-                    del window[lcp]
-            left += 1
-
-        if len(window) >= threshold:
-            return True, set(window.keys())
+        _scan_side(r_codes, r_uniq, s_codes, s_uniq, s_pos,
+                   excluded_fan_in, "fan_in", "aggregator")
+        _scan_side(s_codes, s_uniq, r_codes, r_uniq, r_pos,
+                   excluded_fan_out, "fan_out", "disperser")
 
-    return False, set()
+        log.info("Smurfing detection: %d rings found (fan-in + fan-out)", len(rings))
+        return rings
 
-
-def detect_smurfing(df: pd.DataFrame) -> List[Dict]:
-    """
-    Detect fan-in and fan-out smurfing patterns.
-
-    Returns
-    -------
-    List of ring dicts with keys:
-        members  : list[str]  – all involved accounts
-        pattern  : str        – "fan_in" or "fan_out"
-        hub      : str        – the central aggregator/disperser
-        hub_type : str        – "aggregator" | "disperser"
-    """
-    rings: List[Dict] = []
-    seen_keys: set = set()
-    window_td = timedelta(hours=SMURF_WINDOW_HOURS)
-
-    excluded_fan_in = _merchant_receivers(df)
-    excluded_fan_out = _payroll_senders(df)
-
-    df_s = df.sort_values("timestamp")
-
-# ── Fan-in: many senders → one receiver ────────────────────────────────
-    for receiver, grp in df_s.groupby("receiver_id"):
+    # ── Fan-in: many senders → one receiver ────────────────────────────────
+    for receiver, grp in df_s.groupby("receiver_id", observed=True):
         if receiver in excluded_fan_in:
             continue
-        grp = grp.sort_values("timestamp")
-        times   = grp["timestamp"].tolist()
-        senders = grp["sender_id"].tolist()
-
         triggered, window_senders = _sliding_window_unique(
-            times, senders, receiver, window_td, FAN_THRESHOLD
+            grp["ts_ns"].to_numpy(), grp["sender_id"].to_numpy(),
+            receiver, window_ns, FAN_THRESHOLD,
         )
         if triggered:
             key = ("fan_in", receiver)
@@ -293,15 +328,12 @@ def detect_smurfing(df: pd.DataFrame) -> List[Dict]:
                 })
 
     # ── Fan-out: one sender → many receivers ────────────────────────────────
-    for sender, grp in df_s.groupby("sender_id"):
+    for sender, grp in df_s.groupby("sender_id", observed=True):
         if sender in excluded_fan_out:
             continue
-        grp = grp.sort_values("timestamp")
-        times     = grp["timestamp"].tolist()
-        receivers = grp["receiver_id"].tolist()
-
         triggered, window_receivers = _sliding_window_unique(
-            times, receivers, sender, window_td, FAN_THRESHOLD
+            grp["ts_ns"].to_numpy(), grp["receiver_id"].to_numpy(),
+            sender, window_ns, FAN_THRESHOLD,
         )
         if triggered:
             key = ("fan_out", sender)
@@ -16,58 +16,73 @@ log = logging.getLogger(__name__)
 
 _MERGE_OVERLAP_RATIO = 0.5   # merge if ≥ 50 % of smaller ring overlaps
 
-
-def _should_merge(ring_a: Dict, ring_b: Dict) -> bool:
-    """Return True if the two rings share enough members to be considered the same ring."""
-    set_a = set(ring_a["members"])
-    set_b = set(ring_b["members"])
-    overlap = len(set_a & set_b)
-    smaller = min(len(set_a), len(set_b))
-    if smaller == 0:
-        return False
-    return (overlap / smaller) >= _MERGE_OVERLAP_RATIO
+# Primary-pattern priority for merged rings (highest confidence first)
+_PATTERN_PRIORITY = (
+    "cycle_length_3", "cycle_length_4", "cycle_length_5",
+    "fan_in", "fan_out", "round_trip", "shell_chain",
+)
 
 
 def _merge_rings(rings: List[Dict]) -> List[Dict]:
     """
     Merge overlapping rings into unified rings.
-    Uses a simple union-find-like greedy merge.
+
+    Union-Find over the rings: member sets are built once, an inverted
+    member → rings index limits overlap tests to rings that actually share a
+    member, and clusters come out of path-compressed find/union — quasi-linear
+    instead of the old O(N²) pairwise scan with per-call set rebuilds.
     """
     if not rings:
         return rings
 
+    n = len(rings)
+    msets = [set(r["members"]) for r in rings]
+
+    parent = list(range(n))
+
+    def find(x: int) -> int:
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]  # path halving
+            x = parent[x]
+        return x
+
+    # Inverted index: only rings sharing at least one member can merge.
+    member_to_rings: Dict[str, list] = {}
+    for i, members in enumerate(msets):
+        for m in members:
+            member_to_rings.setdefault(m, []).append(i)
+
+    for ring_idxs in member_to_rings.values():
+        for a in range(len(ring_idxs)):
+            i = ring_idxs[a]
+            for j in ring_idxs[a + 1:]:
+                ri, rj = find(i), find(j)
+                if ri == rj:
+                    continue
+                overlap = len(msets[i] & msets[j])
+                if overlap / min(len(msets[i]), len(msets[j])) >= _MERGE_OVERLAP_RATIO:
+                    # Smaller index stays root so output keeps input order.
+                    parent[max(ri, rj)] = min(ri, rj)
+
+    clusters: Dict[int, list] = {}
+    for i in range(n):
+        clusters.setdefault(find(i), []).append(i)
+
     merged: List[Dict] = []
-    used = [False] * len(rings)
-
-    for i, ring_i in enumerate(rings):
-        if used[i]:
-            continue
-        current = dict(ring_i)
-        current_members = set(ring_i["members"])
-        current_patterns = {ring_i["pattern"]}
-
-        for j in range(i + 1, len(rings)):
-            if used[j]:
-                continue
-            ring_j = rings[j]
-            if _should_merge(current, ring_j):
-                current_members |= set(ring_j["members"])
-                current_patterns.add(ring_j["pattern"])
-                used[j] = True
-
-        current["members"] = sorted(current_members)
+    for root in sorted(clusters):
+        idxs = clusters[root]
+        current = dict(rings[idxs[0]])
+        members = set().union(*(msets[i] for i in idxs))
+        patterns = {rings[i]["pattern"] for i in idxs}
+
+        current["members"] = sorted(members)
         # Keep the highest-priority pattern name as primary pattern
-        _priority = [
-            "cycle_length_3", "cycle_length_4", "cycle_length_5",
-            "fan_in", "fan_out", "round_trip", "shell_chain",
-        ]
-        for p in _priority:
-            if p in current_patterns:
+        for p in _PATTERN_PRIORITY:
+            if p in patterns:
                 current["pattern"] = p
                 break
-        current["merged_patterns"] = sorted(current_patterns)
+        current["merged_patterns"] = sorted(patterns)
         merged.append(current)
-        used[i] = True
 
     log.info("Ring merge: %d → %d rings", len(rings), len(merged))
     return merged
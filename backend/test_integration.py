@@ -2,13 +2,14 @@
 Integration test — verifies all detection patterns, JSON format, and scoring.
 Run:  python backend/test_integration.py
 """
-import csv
 import json
 import os
 import subprocess
 import tempfile
 import sys
 
+import pandas as pd
+
 # ── Build test CSV covering all 3 patterns + a legitimate merchant trap ────────
 rows = [["transaction_id","sender_id","receiver_id","amount","timestamp"]]
 
@@ -43,7 +44,8 @@ rows += [
 # Write to temp file
 tmp = tempfile.NamedTemporaryFile(suffix='.csv', delete=False, mode='w', newline='',
                                   dir=os.path.dirname(os.path.abspath(__file__)))
-csv.writer(tmp).writerows(rows)
+# pandas' C writer emits the whole frame in one call (no per-row Python writerow)
+pd.DataFrame(rows[1:], columns=rows[0]).to_csv(tmp, index=False)
 tmp.close()
 
 # Call the API